@@ -1,7 +1,7 @@
 from .git import GitOps
 from .task import TaskManager
 from .models import Task, TasksList, TaskStatus
-from .config import ConfigOptions
+from .config import ConfigOptions, get_config
 from .store import store, GlobalStore
 
-__all__ = ['GitOps', 'TaskManager', 'Task', 'TasksList', 'TaskStatus', 'ConfigOptions', 'store', 'GlobalStore']
+__all__ = ['GitOps', 'TaskManager', 'Task', 'TasksList', 'TaskStatus', 'ConfigOptions', 'get_config', 'store', 'GlobalStore']
@@ -1,41 +1,236 @@
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    def _dumps_line(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+    def _dumps_line(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    _loads = json.loads
+
+# Fold the tasks log back into the tasks file once it holds this many records per live task
+COMPACT_RATIO = 4
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    """Get the (mtime, size) pair used to detect changes to a file.
+    
+    Args:
+        path (str): File path
+    
+    Returns:
+        Optional[Tuple[int, int]]: Stat key, or None if the file is missing
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 class ConfigOptions:
-    def __init__(self) -> None:
+    def __init__(self, repository_path: Optional[str] = None) -> None:
         self.task_prefix: str = "codesnap@task/"
-        self.config_dir: str = os.path.join(os.getcwd(), ".codesnap")
+        self.config_dir: str = os.path.join(repository_path or os.getcwd(), ".codesnap")
         self.tasks_file: str = os.path.join(self.config_dir, "tasks.json")
-        self.ensure_config_dir()
+        self.tasks_log_file: str = os.path.join(self.config_dir, "tasks.jsonl")
+        self._cache: Optional[List[Dict[str, Any]]] = None
+        self._cache_key: Optional[Tuple[Any, Any]] = None
+        self._log_records: int = 0
+        self._indexes: Optional[Dict[str, Dict[Any, Dict[str, Any]]]] = None
     
-    def ensure_config_dir(self) -> None:
-        """Ensure configuration directory and tasks file exist, creating them if they don't."""
-        if not os.path.exists(self.config_dir):
-            os.makedirs(self.config_dir, exist_ok=True)
+    def _stat_key(self) -> Tuple[Any, Any]:
+        """Get the stat keys of the tasks file and the tasks log.
         
-        # Initialize tasks file if it doesn't exist
-        if not os.path.exists(self.tasks_file):
-            with open(self.tasks_file, "w") as f:
-                json.dump([], f)
+        Returns:
+            Tuple[Any, Any]: (tasks file key, tasks log key), each None if missing
+        """
+        return _stat(self.tasks_file), _stat(self.tasks_log_file)
+    
+    def tasks_version(self) -> Tuple[Any, Any]:
+        """Get a key that changes whenever the stored task list changes.
+        
+        Returns:
+            Tuple[Any, Any]: Opaque version key, comparable with ==
+        """
+        return self._stat_key()
+    
+    def _read_tasks(self) -> List[Dict[str, Any]]:
+        """Get the cached task list, re-reading it if the tasks file or log changed.
+        
+        The tasks file holds a full snapshot; each line of the tasks log is a
+        later version of a single task and replaces the task with the same id.
+        
+        Returns:
+            List[Dict[str, Any]]: Cached task list (not a copy)
+        """
+        key = self._stat_key()
+        if self._cache is not None and key == self._cache_key:
+            return self._cache
+        
+        tasks: List[Dict[str, Any]] = []
+        if key[0] is not None:
+            try:
+                with open(self.tasks_file, "rb") as f:
+                    tasks = _loads(f.read())
+            except (FileNotFoundError, ValueError):
+                tasks = []
+        
+        records = 0
+        if key[1] is not None:
+            by_id = {task["id"]: task for task in tasks}
+            try:
+                with open(self.tasks_log_file, "rb") as f:
+                    for line in f:
+                        try:
+                            record = _loads(line)
+                        except ValueError:
+                            # Blank or torn line left by an interrupted append
+                            continue
+                        by_id[record["id"]] = record
+                        records += 1
+            except FileNotFoundError:
+                pass
+            tasks = list(by_id.values())
+        
+        self._cache = tasks
+        self._cache_key = key
+        self._log_records = records
+        self._indexes = None
+        return tasks
     
     def load_tasks(self) -> List[Dict[str, Any]]:
-        """Load task data from the tasks file.
+        """Load task data from the tasks file and tasks log.
+        
+        The parsed content is cached in memory and only re-read when the
+        modification time or size of either file changes.
         
         Returns:
             List[Dict[str, Any]]: List of task data, where each task is a dictionary
         """
-        try:
-            with open(self.tasks_file, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        # Callers mutate the returned task dicts, so hand out copies
+        return [dict(task) for task in self._read_tasks()]
+    
+    def find_task(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Look up the first task whose field equals value.
+        
+        Lookups by "name" and "branch" go through dict indexes that are built
+        once per version of the cached task list.
+        
+        Args:
+            field (str): Task field to match, "name" or "branch"
+            value (Any): Value to look for
+        
+        Returns:
+            Optional[Dict[str, Any]]: Copy of the matching task, or None if not found
+        """
+        tasks = self._read_tasks()
+        if self._indexes is None:
+            self._indexes = {"name": {}, "branch": {}}
+            for task in tasks:
+                self._indexes["name"].setdefault(task["name"], task)
+                self._indexes["branch"].setdefault(task["branch"], task)
+        
+        task = self._indexes[field].get(value)
+        return dict(task) if task is not None else None
+    
+    def next_task_id(self) -> int:
+        """Get the next available task ID from the cached task list.
+        
+        Returns:
+            int: One more than the highest task ID, or 1 if there are no tasks
+        """
+        return max((task.get("id", 0) for task in self._read_tasks()), default=0) + 1
     
     def save_tasks(self, tasks: List[Dict[str, Any]]) -> None:
         """Save task data to the tasks file.
         
+        The data is written to a temporary file and renamed over the tasks file,
+        so a crash mid-write never leaves a truncated tasks file behind. The
+        tasks log is folded into the new file and removed.
+        
         Args:
             tasks (List[Dict[str, Any]]): List of task data to save
         """
-        with open(self.tasks_file, "w") as f:
-            json.dump(tasks, f, indent=4)
+        data = _dumps(tasks)
+        os.makedirs(self.config_dir, exist_ok=True)
+        tmp_file = self.tasks_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.tasks_file)
+        try:
+            os.remove(self.tasks_log_file)
+        except FileNotFoundError:
+            pass
+        self._cache = [dict(task) for task in tasks]
+        self._cache_key = self._stat_key()
+        self._log_records = 0
+        self._indexes = None
+    
+    def save_task(self, task: Dict[str, Any]) -> None:
+        """Save a single new or updated task without rewriting the tasks file.
+        
+        The task is appended as one line to the tasks log. Once the log grows
+        past COMPACT_RATIO records per live task it is compacted into the
+        tasks file.
+        
+        Args:
+            task (Dict[str, Any]): Task data, identified by its "id"
+        """
+        tasks = self._read_tasks()
+        for i, existing in enumerate(tasks):
+            if existing["id"] == task["id"]:
+                tasks[i] = dict(task)
+                break
+        else:
+            tasks.append(dict(task))
+        self._indexes = None
+        
+        if self._log_records + 1 > COMPACT_RATIO * len(tasks):
+            self.save_tasks(tasks)
+            return
+        
+        os.makedirs(self.config_dir, exist_ok=True)
+        line = _dumps_line(task)
+        with open(self.tasks_log_file, "a+b") as f:
+            # An interrupted append can leave a torn last line; end it first so
+            # this record is not glued onto it and lost as well
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+        self._cache_key = self._stat_key()
+        self._log_records += 1
+
+
+_configs: Dict[Optional[str], ConfigOptions] = {}
+
+
+def get_config(repository_path: Optional[str] = None) -> ConfigOptions:
+    """Get the shared configuration for a repository, creating it on first use.
+    
+    Args:
+        repository_path (Optional[str]): Repository path, if None then use the current working directory
+    
+    Returns:
+        ConfigOptions: Shared configuration instance
+    """
+    config = _configs.get(repository_path)
+    if config is None:
+        config = _configs[repository_path] = ConfigOptions(repository_path)
+    return config
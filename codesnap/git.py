@@ -1,44 +1,51 @@
 import os
-from datetime import datetime
-from typing import Tuple, List, Optional
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Tuple, List, Optional, Set, Iterator
 import git
-from git import Repo, GitCommandError
+from git import Repo, GitCommandError, SymbolicReference
 
-from .config import ConfigOptions
+from .config import get_config
+
+# Maximum number of cached log/diff results kept per GitOps instance
+RANGE_CACHE_SIZE = 32
 
 
 class GitOps:
-    def __init__(self) -> None:
-        self.config = ConfigOptions()
+    def __init__(self, repository_path: Optional[str] = None) -> None:
+        self.config = get_config(repository_path)
+        self.repository_path: str = repository_path or os.getcwd()
         self._repo = None
+        self._main_branch_cache: Optional[str] = None
+        self._main_branch_checked: bool = False
+        self._range_cache: Dict[Tuple[str, str, str], Any] = {}
     
     @property
     def repo(self):
         """
-        Get the git.Repo instance for the current directory.
+        Get the git.Repo instance for the repository path.
+        
+        The repository is opened once and reused; a failed probe is not cached
+        so a repository initialized later is still picked up.
         
         Returns:
-            git.Repo: Repository instance
+            git.Repo: Repository instance, or None if not a Git repository
         """
-        if self._repo is None and self.is_git_repo():
+        if self._repo is None:
             try:
-                self._repo = Repo(os.getcwd())
-            except GitCommandError:
+                self._repo = Repo(self.repository_path)
+            except (git.exc.InvalidGitRepositoryError, git.exc.NoSuchPathError):
                 pass
         return self._repo
     
     def is_git_repo(self) -> bool:
         """
-        Check if the current directory is a Git repository.
+        Check if the repository path is a Git repository.
         
         Returns:
             bool: True if it's a Git repository, False otherwise
         """
-        try:
-            Repo(os.getcwd())
-            return True
-        except (git.exc.InvalidGitRepositoryError, git.exc.NoSuchPathError):
-            return False
+        return self.repo is not None
     
     def initialize_repository(self, branch_name: str = "master") -> bool:
         """
@@ -54,18 +61,18 @@ class GitOps:
             return False
         
         try:
-            # Initialize repository
-            repo = Repo.init(os.getcwd())
+            # Initialize repository with the main branch already checked out
+            repo = Repo.init(self.repository_path, initial_branch=branch_name)
             self._repo = repo
+            self.invalidate_main_branch()
             
             # Create a .gitignore file if it doesn't exist
-            if not os.path.exists(".gitignore"):
-                with open(".gitignore", "w") as f:
-                    f.write("# CodeSnap auto-generated .gitignore\n")
+            gitignore = Path(self.repository_path, ".gitignore")
+            if not gitignore.exists():
+                gitignore.write_bytes(b"# CodeSnap auto-generated .gitignore\n")
             
             # Add all files and create initial commit
-            repo.git.add(A=True)
-            repo.git.checkout(b=branch_name)
+            repo.git.add(A=True, with_stdout=False)
             repo.git.commit(m="Initial commit")
             return True
         except GitCommandError:
@@ -85,12 +92,13 @@ class GitOps:
         except (GitCommandError, TypeError):
             return None
     
-    def create_branch(self, branch_name: str) -> Tuple[bool, str]:
+    def create_branch(self, branch_name: str, start_point: Optional[str] = None) -> Tuple[bool, str]:
         """
         Create and switch to a new branch.
         
         Args:
             branch_name (str): The name of the new branch
+            start_point (Optional[str]): Branch to start from, defaults to the current HEAD
             
         Returns:
             Tuple[bool, str]: (success flag, output or error message)
@@ -98,12 +106,52 @@ class GitOps:
         if not self.repo:
             return False, "Not a git repository"
         
+        args = ["-b", branch_name]
+        if start_point:
+            args.append(start_point)
+        
         try:
-            self.repo.git.checkout(b=branch_name)
+            self.repo.git.checkout(*args, with_stdout=False)
             return True, f"Switched to a new branch '{branch_name}'"
         except GitCommandError as e:
             return False, str(e)
     
+    def create_branches(self, branch_names: List[str], start_point: str) -> Tuple[bool, str]:
+        """
+        Create several branches at the same commit with a single git call, without switching.
+        
+        The refs are written in one update-ref transaction, so either all of the
+        branches are created or none are.
+        
+        Args:
+            branch_names (List[str]): The names of the new branches
+            start_point (str): Branch to start from
+            
+        Returns:
+            Tuple[bool, str]: (success flag, output or error message)
+        """
+        if not self.repo:
+            return False, "Not a git repository"
+        
+        if not branch_names:
+            return True, "No branches to create"
+        
+        try:
+            sha = SymbolicReference.dereference_recursive(self.repo, f"refs/heads/{start_point}")
+        except (ValueError, OSError):
+            return False, f"Branch '{start_point}' does not exist"
+        
+        # NUL-terminated fields, so names with spaces are rejected as refs instead of misparsed
+        commands = "".join(f"create refs/heads/{name}\0{sha}\0" for name in branch_names)
+        try:
+            with tempfile.TemporaryFile() as stdin:
+                stdin.write(commands.encode("utf-8"))
+                stdin.seek(0)
+                self.repo.git.update_ref("--stdin", "-z", istream=stdin, with_stdout=False)
+            return True, f"Created {len(branch_names)} branch(es)"
+        except GitCommandError as e:
+            return False, str(e)
+    
     def checkout_branch(self, branch_name: str) -> Tuple[bool, str]:
         """
         Switch to the specified branch.
@@ -118,7 +166,7 @@ class GitOps:
             return False, "Not a git repository"
         
         try:
-            self.repo.git.checkout(branch_name)
+            self.repo.git.checkout(branch_name, with_stdout=False)
             return True, f"Switched to branch '{branch_name}'"
         except GitCommandError as e:
             return False, str(e)
@@ -138,6 +186,44 @@ class GitOps:
         except GitCommandError:
             return ""
     
+    def has_changes(self) -> bool:
+        """
+        Check whether the working directory has any changes.
+        
+        The porcelain output is kept as raw bytes since only its emptiness matters.
+        
+        Returns:
+            bool: True if there are staged, unstaged or untracked changes
+        """
+        if not self.repo:
+            return False
+        
+        try:
+            output = self.repo.git.status(porcelain=True, z=True, stdout_as_string=False)
+        except GitCommandError:
+            return False
+        return bool(output[:1])
+    
+    def is_dirty(self) -> bool:
+        """
+        Cheaply check whether tracked files have staged or unstaged changes.
+        
+        Untracked files are not looked for, which spares git the walk over the
+        whole working tree that has_changes needs.
+        
+        Returns:
+            bool: True if tracked files differ from HEAD or the index
+        """
+        if not self.repo:
+            return False
+        
+        try:
+            output = self.repo.git.status(porcelain="v2", z=True, untracked_files="no",
+                                          stdout_as_string=False)
+        except GitCommandError:
+            return False
+        return bool(output[:1])
+    
     def commit_changes(self, message: str) -> Tuple[bool, str]:
         """
         Commit current changes.
@@ -151,97 +237,308 @@ class GitOps:
         if not self.repo:
             return False, "Not a git repository"
             
-        if not self.get_changes():
-            return False, "No changes to commit"
-
         current_branch = self.get_current_branch()
-        if self.config.task_prefix in current_branch:
-            try:
-                self.repo.git.add(A=True)
-                self.repo.git.commit(m=message)
-                commit_hash = self.repo.head.commit.hexsha[:7]
-                return True, f"[{current_branch} {commit_hash}] {message}"
-            except GitCommandError as e:
-                return False, f"Failed to commit: {str(e)}"
-        else:
+        if not current_branch or not current_branch.startswith(self.config.task_prefix):
             return False, "Not on a task branch"
+            
+        try:
+            self.repo.git.add(A=True, with_stdout=False)
+            self.repo.git.commit(m=message)
+            commit_hash = self._head_short_sha()
+            return True, f"[{current_branch} {commit_hash}] {message}"
+        except GitCommandError as e:
+            # GitPython runs git under the C locale, so the message is stable
+            if "nothing to commit" in str(e):
+                return False, "No changes to commit"
+            return False, f"Failed to commit: {str(e)}"
+    
+    def _head_short_sha(self) -> str:
+        """
+        Get the abbreviated hash of the commit HEAD points to.
+        
+        The hash is resolved in-process from the ref, without parsing command output.
+        
+        Returns:
+            str: First 7 characters of the HEAD commit hash
+        """
+        return self.repo.head.commit.hexsha[:7]
+    
+    def list_local_branches(self) -> Set[str]:
+        """
+        Get the names of all local branches.
+        
+        Returns:
+            Set[str]: Local branch names
+        """
+        if not self.repo:
+            return set()
+        return {head.name for head in self.repo.heads}
     
     def get_main_branch(self) -> Optional[str]:
         """
         Get the main branch name (master or main).
         
+        The result is cached on the instance; call invalidate_main_branch()
+        to force a fresh lookup.
+        
         Returns:
             Optional[str]: The main branch name, or None if not found
         """
+        if self._main_branch_checked:
+            return self._main_branch_cache
+        
         if not self.repo:
             return None
-            
+        
+        self._main_branch_cache = None
         for branch in ["master", "main"]:
-            try:
-                if branch in [ref.name for ref in self.repo.refs]:
-                    return branch
-            except GitCommandError:
-                pass
-        return None
+            if self.verify_branch_exists(branch):
+                self._main_branch_cache = branch
+                break
+        self._main_branch_checked = True
+        return self._main_branch_cache
     
-    def get_task_log(self, show_graph: bool = False) -> List[str]:
+    def invalidate_main_branch(self) -> None:
+        """Forget the cached main branch name."""
+        self._main_branch_cache = None
+        self._main_branch_checked = False
+    
+    def _range_key(self, kind: str, main_branch: str, current_branch: str) -> Optional[Tuple[str, str, str]]:
         """
-        Get the commit log of the task branch relative to the main branch.
+        Build the cache key for a main..current range result.
+        
+        The key holds the commit SHAs both branches point to, read straight
+        from the ref files, so it changes whenever either branch moves.
         
         Args:
-            show_graph (bool): Whether to display a commit graph, defaults to False
+            kind (str): Kind of cached result, e.g. "log" or "diff"
+            main_branch (str): The main branch name
+            current_branch (str): The current branch name
             
         Returns:
-            List[str]: List of commit log lines
+            Optional[Tuple[str, str, str]]: Cache key, or None if a ref cannot be resolved
+        """
+        try:
+            return (
+                kind,
+                SymbolicReference.dereference_recursive(self.repo, f"refs/heads/{main_branch}"),
+                SymbolicReference.dereference_recursive(self.repo, f"refs/heads/{current_branch}"),
+            )
+        except (ValueError, OSError):
+            return None
+    
+    def _cache_range(self, key: Optional[Tuple[str, str, str]], value: Any) -> None:
+        """
+        Remember a range result under its key, dropping old entries when full.
+        
+        Readers look entries up with a single get(), so a clear() from another
+        thread can only turn a hit into a miss, never raise.
+        
+        Args:
+            key (Optional[Tuple[str, str, str]]): Key from _range_key, or None to skip caching
+            value (Any): Result to cache
+        """
+        if key is None:
+            return
+        if len(self._range_cache) >= RANGE_CACHE_SIZE:
+            self._range_cache.clear()
+        self._range_cache[key] = value
+    
+    def _resolve_task_range(self) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Resolve the main branch and the current branch of a main..current range.
+        
+        Returns:
+            Tuple[Optional[str], Optional[str], Optional[str]]: (main branch, current branch,
+                error message), where the error message is None if both were resolved
         """
         if not self.repo:
-            return ["Not a git repository"]
-            
+            return None, None, "Not a git repository"
+        
         main_branch = self.get_main_branch()
         current_branch = self.get_current_branch()
         
         if not main_branch or not current_branch:
-            return ["Unable to determine branches"]
+            return None, None, "Unable to determine branches"
+        return main_branch, current_branch, None
+    
+    @staticmethod
+    def _log_args(main_branch: str, current_branch: str, show_graph: bool = False,
+                  max_count: int = 0, first_parent: bool = False) -> List[str]:
+        """
+        Build the git log arguments for the task log.
+        
+        Args:
+            main_branch (str): The main branch name
+            current_branch (str): The current branch name
+            show_graph (bool): Whether to display a commit graph, defaults to False
+            max_count (int): Maximum number of commits to show, 0 for all, defaults to 0
+            first_parent (bool): Whether to only follow the first parent of merge
+                commits, defaults to False
+            
+        Returns:
+            List[str]: Arguments for git log
+        """
+        args = ["--graph", "--oneline", "--decorate"] if show_graph else ["--oneline"]
+        if max_count > 0:
+            args.append(f"--max-count={max_count}")
+        if first_parent:
+            args.append("--first-parent")
+        args.append(f"{main_branch}..{current_branch}")
+        return args
+    
+    @staticmethod
+    def _diff_args(main_branch: str, current_branch: str, name_only: bool = False) -> List[str]:
+        """
+        Build the git diff arguments for the task diff.
+        
+        Args:
+            main_branch (str): The main branch name
+            current_branch (str): The current branch name
+            name_only (bool): Only list changed files with their status letter, defaults to False
+            
+        Returns:
+            List[str]: Arguments for git diff
+        """
+        args = ["--name-status"] if name_only else []
+        args.append(f"{main_branch}..{current_branch}")
+        return args
+    
+    def get_task_log(self, show_graph: bool = False, max_count: int = 0,
+                     first_parent: bool = False) -> List[str]:
+        """
+        Get the commit log of the task branch relative to the main branch.
+        
+        Args:
+            show_graph (bool): Whether to display a commit graph, defaults to False
+            max_count (int): Maximum number of commits to show, 0 for all, defaults to 0
+            first_parent (bool): Whether to only follow the first parent of merge
+                commits, defaults to False
+            
+        Returns:
+            List[str]: List of commit log lines
+        """
+        main_branch, current_branch, error = self._resolve_task_range()
+        if error:
+            return [error]
+
+        # The decorated graph also depends on other refs, so only the plain log is cached
+        kind = f"log:{max_count}:{int(first_parent)}"
+        key = None if show_graph else self._range_key(kind, main_branch, current_branch)
+        cached = self._range_cache.get(key)
+        if cached is not None:
+            return list(cached)
 
         try:
-            if show_graph:
-                output = self.repo.git.log("--graph", "--oneline", "--decorate", f"{main_branch}..{current_branch}")
-            else:
-                output = self.repo.git.log("--oneline", f"{main_branch}..{current_branch}")
+            output = self.repo.git.log(*self._log_args(main_branch, current_branch, show_graph,
+                                                       max_count, first_parent))
                 
             if not output:
                 return ["No commits found"]
                 
-            return output.split('\n')
+            lines = output.split('\n')
+            self._cache_range(key, lines)
+            return list(lines)
         except GitCommandError:
             return ["No commits found"]
     
-    def get_diff(self) -> str:
+    def iter_task_log(self, show_graph: bool = False, max_count: int = 0,
+                      first_parent: bool = False) -> Iterator[str]:
+        """
+        Stream the commit log of the task branch relative to the main branch.
+        
+        Lines are yielded as git produces them instead of being collected first.
+        
+        Args:
+            show_graph (bool): Whether to display a commit graph, defaults to False
+            max_count (int): Maximum number of commits to show, 0 for all, defaults to 0
+            first_parent (bool): Whether to only follow the first parent of merge
+                commits, defaults to False
+            
+        Yields:
+            str: Commit log lines (without line endings), or a single message
+        """
+        main_branch, current_branch, error = self._resolve_task_range()
+        if error:
+            yield error
+            return
+        
+        empty = True
+        try:
+            proc = self.repo.git.log(*self._log_args(main_branch, current_branch, show_graph,
+                                                     max_count, first_parent),
+                                     as_process=True)
+            for line in proc.stdout:
+                empty = False
+                yield line.rstrip(b"\n").decode("utf-8", errors="replace")
+            proc.wait()
+        except GitCommandError:
+            pass
+        if empty:
+            yield "No commits found"
+    
+    def get_diff(self, name_only: bool = False) -> str:
         """
         Get the differences between the current branch and the main branch.
         
+        Args:
+            name_only (bool): Only list changed files with their status letter,
+                without generating patch text, defaults to False
+            
         Returns:
             str: Difference content or error message
         """
-        if not self.repo:
-            return "Not a git repository"
-            
-        main_branch = self.get_main_branch()
-        current_branch = self.get_current_branch()
+        main_branch, current_branch, error = self._resolve_task_range()
+        if error:
+            return error
         
-        if not main_branch or not current_branch:
-            return "Unable to determine branches"
+        key = self._range_key("diff-names" if name_only else "diff", main_branch, current_branch)
+        cached = self._range_cache.get(key)
+        if cached is not None:
+            return cached
         
         try:
-            output = self.repo.git.diff(f"{main_branch}..{current_branch}")
-            return output if output else "No differences found"
+            output = self.repo.git.diff(*self._diff_args(main_branch, current_branch, name_only))
+            result = output if output else "No differences found"
+            self._cache_range(key, result)
+            return result
         except GitCommandError as e:
             return str(e)
     
+    def iter_diff(self) -> Iterator[str]:
+        """
+        Stream the differences between the current branch and the main branch.
+        
+        Lines are yielded as git produces them, so large diffs are never held
+        in memory as a single string.
+        
+        Yields:
+            str: Diff lines (with line endings), or a single error message
+        """
+        main_branch, current_branch, error = self._resolve_task_range()
+        if error:
+            yield f"{error}\n"
+            return
+        
+        try:
+            proc = self.repo.git.diff(*self._diff_args(main_branch, current_branch), as_process=True)
+            empty = True
+            for line in proc.stdout:
+                empty = False
+                yield line.decode("utf-8", errors="replace")
+            proc.wait()
+            if empty:
+                yield "No differences found\n"
+        except GitCommandError as e:
+            yield f"{e}\n"
+    
     def verify_branch_exists(self, branch_name: str) -> bool:
         """
         Check if a branch exists in the repository.
         
+        Only the single ref is resolved (loose ref file, then packed-refs),
+        without listing every branch or spawning git.
+        
         Args:
             branch_name (str): The name of the branch to check
             
@@ -252,9 +549,9 @@ class GitOps:
             return False
         
         try:
-            # Check if the branch exists in the list of branches
-            return branch_name in [head.name for head in self.repo.heads]
-        except GitCommandError:
+            SymbolicReference.dereference_recursive(self.repo, f"refs/heads/{branch_name}")
+            return True
+        except (ValueError, OSError):
             return False
     
     def merge_without_commit(self, branch_name: str) -> Tuple[bool, str]:
@@ -308,7 +605,7 @@ class GitOps:
         
         try:
             self.repo.git.merge("--no-ff", branch_name, "-m", message)
-            commit_hash = self.repo.head.commit.hexsha[:7]
+            commit_hash = self._head_short_sha()
             return True, f"[{self.get_current_branch()} {commit_hash}] {message}"
         except GitCommandError as e:
             return False, str(e)
@@ -332,40 +629,28 @@ class GitOps:
         if not main_branch or not current_branch:
             return False, "Unable to determine branches"
 
-        temp_branch = f"temp-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
+        switched = False
         try:
             # Checkout main branch
-            self.repo.git.checkout(main_branch)
-            
-            # Create temporary branch
-            self.repo.git.checkout(b=temp_branch)
+            self.repo.git.checkout(main_branch, with_stdout=False)
+            switched = True
             
-            # Squash merge the current branch
+            # Squash merge the current branch straight onto the main branch
             self.repo.git.merge("--squash", current_branch)
             
             # Commit the squashed changes
             self.repo.git.commit(m=message)
             
             # Get commit hash
-            commit_hash = self.repo.head.commit.hexsha[:7]
-            
-            # Checkout main branch again
-            self.repo.git.checkout(main_branch)
-            
-            # Merge the temporary branch
-            self.repo.git.merge(temp_branch)
-            
-            # Delete temporary branch
-            self.repo.git.branch(D=temp_branch)
+            commit_hash = self._head_short_sha()
             
             return True, f"[{main_branch} {commit_hash}] {message}"
         except GitCommandError as e:
             # Try to cleanup
             try:
-                self.repo.git.checkout(current_branch)
-                if temp_branch in [ref.name for ref in self.repo.refs]:
-                    self.repo.git.branch(D=temp_branch)
+                if switched:
+                    self.repo.git.reset("--merge", with_stdout=False)
+                self.repo.git.checkout(current_branch, with_stdout=False)
             except GitCommandError:
                 pass
             return False, str(e)
@@ -382,15 +667,15 @@ class GitOps:
             
         current_branch = self.get_current_branch()
         
-        if not current_branch or self.config.task_prefix not in current_branch:
+        if not current_branch or not current_branch.startswith(self.config.task_prefix):
             return False, "Not on a task branch"
 
         try:
             # Reset all changes
-            self.repo.git.reset("--hard", "HEAD")
+            self.repo.git.reset("--hard", "HEAD", with_stdout=False)
             
             # Clean untracked files
-            self.repo.git.clean("-fd")
+            self.repo.git.clean("-fd", with_stdout=False)
             
             return True, "All changes have been abandoned"
         except GitCommandError as e:
@@ -410,7 +695,30 @@ class GitOps:
             return False, "Not a git repository"
             
         try:
-            self.repo.git.branch(D=branch_name)
+            self.repo.git.branch(D=branch_name, with_stdout=False)
             return True, f"Deleted branch {branch_name}"
         except GitCommandError as e:
             return False, str(e)
+    
+    def delete_branches(self, branch_names: List[str]) -> Tuple[bool, str]:
+        """
+        Delete several branches with a single git call.
+        
+        Args:
+            branch_names (List[str]): The names of the branches to delete
+            
+        Returns:
+            Tuple[bool, str]: (success flag, output or error message)
+        """
+        if not self.repo:
+            return False, "Not a git repository"
+        
+        if not branch_names:
+            return True, "No branches to delete"
+            
+        unique_names = list(dict.fromkeys(branch_names))
+        try:
+            self.repo.git.branch("-D", *unique_names, with_stdout=False)
+            return True, f"Deleted {len(unique_names)} branch(es)"
+        except GitCommandError as e:
+            return False, str(e)
@@ -4,7 +4,7 @@ from enum import Enum
 from pydantic import BaseModel
 
 
-class TaskStatus(Enum):
+class TaskStatus(str, Enum):
     ACTIVE = "Active"
     MERGED = "Merged"
     ABORTED = "Aborted"
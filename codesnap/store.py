@@ -16,23 +16,23 @@ class GlobalStore:
         """
         Initialize the repository manager and Git operations tool
         
+        Calling it again for the same repository keeps the existing instances.
+        
         Args:
             repository_path: Repository path, if None then use the current working directory
         """
         if repository_path is not None:
-            self.repository_path = Path(repository_path)
+            target = Path(repository_path)
         else:
-            self.repository_path = Path(os.getcwd())
+            target = Path(os.getcwd())
 
-        original_dir = os.getcwd()
-        os.chdir(str(self.repository_path))
+        if self.task_manager is not None and target == self.repository_path:
+            return
 
-        try:
-            self.task_manager = TaskManager()
-            self.git_ops = GitOps()
-        except Exception as e:
-            os.chdir(original_dir)
-            raise e
+        self.repository_path = target
+        path = str(self.repository_path)
+        self.task_manager = TaskManager(path)
+        self.git_ops = GitOps(path)
 
 
 store = GlobalStore()
@@ -1,15 +1,19 @@
-from datetime import datetime
-from typing import List, Dict, Tuple, Optional, Any
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Optional, Any, Iterator
 
 from .git import GitOps
 from .models import Task, TaskStatus
-from .config import ConfigOptions
+from .config import get_config
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
 class TaskManager:
-    def __init__(self) -> None:
-        self.config = ConfigOptions()
-        self.git: GitOps = GitOps()
+    def __init__(self, repository_path: Optional[str] = None) -> None:
+        self.config = get_config(repository_path)
+        self.git: GitOps = GitOps(repository_path)
     
     def _load_tasks(self) -> List[Dict[str, Any]]:
         """
@@ -29,6 +33,29 @@ class TaskManager:
         """
         self.config.save_tasks(tasks)
 
+    def _save_task(self, task: Dict[str, Any]) -> None:
+        """
+        Save a single new or updated task without rewriting the whole task list.
+        
+        Args:
+            task (Dict[str, Any]): Task data to save
+        """
+        self.config.save_task(task)
+
+    @contextmanager
+    def _tasks_txn(self) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Load the task list once and save it once when the block exits.
+        
+        Nothing is written if the block raises.
+        
+        Yields:
+            List[Dict[str, Any]]: Task list to mutate in place
+        """
+        tasks = self._load_tasks()
+        yield tasks
+        self._save_tasks(tasks)
+
     def _get_next_id(self, tasks: List[Dict[str, Any]]) -> int:
         """
         Get the next available task ID.
@@ -59,7 +86,7 @@ class TaskManager:
         if not self.git.is_git_repo():
             return False, "Not in a Git repository"
 
-        if not force and self.git.get_changes():
+        if not force and self.git.has_changes():
             return False, "You have uncommitted changes. Use --force to proceed anyway"
 
         if not base_branch:
@@ -72,20 +99,14 @@ class TaskManager:
 
         branch_name = f"{self.config.task_prefix}{task_name}"
 
-        success, output = self.git.checkout_branch(base_branch)
-        if not success:
-            return False, f"Failed to checkout base branch: {output}"
-
-        success, output = self.git.create_branch(branch_name)
+        success, output = self.git.create_branch(branch_name, base_branch)
         if not success:
             return False, f"Failed to create task branch: {output}"
 
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        tasks = self._load_tasks()
-        task_id = self._get_next_id(tasks)
+        now = time.strftime(TIME_FORMAT)
         
         new_task = Task(
-            id=task_id,
+            id=self.config.next_task_id(),
             name=task_name,
             branch=branch_name,
             base_branch=base_branch,
@@ -96,15 +117,65 @@ class TaskManager:
             commits=0
         )
         
-        # 确保枚举值被转换为字符串
-        task_dict = new_task.model_dump()
-        task_dict['status'] = task_dict['status'].value
-        
-        tasks.append(task_dict)
-        self._save_tasks(tasks)
+        self._save_task(new_task.model_dump(mode="json"))
         
         return True, f"Created task branch '{branch_name}'\nDescription: {description or 'None'}\nCreated: {now}"
     
+    def create_tasks(self, specs: List[Tuple[str, str]], base_branch: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Create several tasks at once without switching branches.
+        
+        All task branches start from the same base branch and are created with a
+        single git call; the task list is written once, with the new tasks
+        appended in the order given.
+        
+        Args:
+            specs (List[Tuple[str, str]]): (task name, description) pairs
+            base_branch (Optional[str]): Base branch, defaults to current branch
+            
+        Returns:
+            Tuple[bool, str]: (success flag, output or error message)
+        """
+        if not self.git.is_git_repo():
+            return False, "Not in a Git repository"
+
+        if not specs:
+            return False, "No tasks to create"
+
+        if not base_branch:
+            base_branch = self.git.get_current_branch()
+            if not base_branch:
+                return False, "Unable to determine current branch"
+
+        if not self.git.verify_branch_exists(base_branch):
+            return False, f"Base branch '{base_branch}' does not exist"
+
+        branch_names = [f"{self.config.task_prefix}{task_name}" for task_name, _ in specs]
+
+        success, output = self.git.create_branches(branch_names, base_branch)
+        if not success:
+            return False, f"Failed to create task branches: {output}"
+
+        now = time.strftime(TIME_FORMAT)
+        with self._tasks_txn() as tasks:
+            task_id = self._get_next_id(tasks)
+            for (task_name, description), branch_name in zip(specs, branch_names):
+                new_task = Task(
+                    id=task_id,
+                    name=task_name,
+                    branch=branch_name,
+                    base_branch=base_branch,
+                    description=description,
+                    status=TaskStatus.ACTIVE,
+                    created=now,
+                    last_activity=now,
+                    commits=0
+                )
+                tasks.append(new_task.model_dump(mode="json"))
+                task_id += 1
+
+        return True, f"Created {len(branch_names)} task branch(es) from '{base_branch}'"
+    
     def list_tasks(self) -> List[Dict[str, Any]]:
         """
         Get a list of all tasks.
@@ -118,17 +189,18 @@ class TaskManager:
         tasks_data = self._load_tasks()
         result = []
         
+        # The tasks file is written by us, so read the fields directly rather than
+        # running full model validation for every task
+        active = TaskStatus.ACTIVE
         for task_data in tasks_data:
-            task = Task.model_validate(task_data)
-
             result.append({
-                "id": task.id,
-                "name": task.name,
-                "status": task.status,
-                "created": task.created,
-                "last_activity": task.last_activity,
-                "commits": task.commits,
-                "description": task.description or "No description"
+                "id": task_data["id"],
+                "name": task_data["name"],
+                "status": TaskStatus(task_data.get("status", active)),
+                "created": task_data["created"],
+                "last_activity": task_data["last_activity"],
+                "commits": task_data.get("commits", 0),
+                "description": task_data.get("description") or "No description"
             })
         
         return result
@@ -141,15 +213,14 @@ class TaskManager:
             Optional[Task]: Current task object, or None if not on a task branch
         """
         current_branch = self.git.get_current_branch()
-        if not current_branch or self.config.task_prefix not in current_branch:
+        if not current_branch or not current_branch.startswith(self.config.task_prefix):
             return None
         
-        tasks = self._load_tasks()
-        for task_data in tasks:
-            if task_data["branch"] == current_branch:
-                return Task.model_validate(task_data)
+        task_data = self.config.find_task("branch", current_branch)
+        if task_data is None:
+            return None
         
-        return None
+        return Task.model_validate(task_data)
     
     def update_task_status(self, task_name: str, status: TaskStatus, increment_commits: bool = False) -> bool:
         """
@@ -163,24 +234,47 @@ class TaskManager:
         Returns:
             bool: True if update successful, False otherwise
         """
-        tasks = self._load_tasks()
-        updated = False
+        task = self.config.find_task("name", task_name)
+        if task is None:
+            return False
         
+        self._apply_status(task, status, increment_commits)
+        self._save_task(task)
+        return True
+
+    def _mark_task(self, tasks: List[Dict[str, Any]], task_name: str, status: TaskStatus, increment_commits: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Update task status in an already loaded task list, without saving.
+        
+        Args:
+            tasks (List[Dict[str, Any]]): Task list to update in place
+            task_name (str): Task name
+            status (TaskStatus): New status
+            increment_commits (bool): Whether to increment commit count, defaults to False
+            
+        Returns:
+            Optional[Dict[str, Any]]: The updated task, or None if not found
+        """
         for task in tasks:
             if task["name"] == task_name:
-                # 将TaskStatus枚举转换为字符串形式再保存
-                task["status"] = status.value if isinstance(status, TaskStatus) else status
-                task["last_activity"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                if increment_commits:
-                    task["commits"] += 1
-                updated = True
-                break
-        
-        if updated:
-            self._save_tasks(tasks)
-            return True
+                self._apply_status(task, status, increment_commits)
+                return task
         
-        return False
+        return None
+
+    def _apply_status(self, task: Dict[str, Any], status: TaskStatus, increment_commits: bool = False) -> None:
+        """
+        Set the status and last activity of a single task in place.
+        
+        Args:
+            task (Dict[str, Any]): Task data to update
+            status (TaskStatus): New status
+            increment_commits (bool): Whether to increment commit count, defaults to False
+        """
+        task["status"] = status
+        task["last_activity"] = time.strftime(TIME_FORMAT)
+        if increment_commits:
+            task["commits"] += 1
 
     def apply_changes(self, return_to_task: bool = True) -> Tuple[bool, str]:
         """
@@ -198,7 +292,8 @@ class TaskManager:
 
         base_branch = task.base_branch
 
-        current_branch = self.git.get_current_branch()
+        # get_current_task only matches the checked-out branch
+        current_branch = task.branch
 
         success, output = self.git.checkout_branch(base_branch)
         if not success:
@@ -233,7 +328,7 @@ class TaskManager:
             return False, "Not on a task branch"
 
         base_branch = task.base_branch
-        current_branch = self.git.get_current_branch()
+        current_branch = task.branch
         
         if squash:
             if not message:
@@ -291,18 +386,21 @@ class TaskManager:
         if not success:
             return False, f"Failed to switch back to {base_branch}: {output}"
 
-        # 将任务状态更新为终止
-        self.update_task_status(task_name, TaskStatus.ABORTED, False)
-
+        deleted = False
         if delete_branch:
-            success, output = self.git.delete_branch(task_branch)
-            if success:
-                tasks = self._load_tasks()
-                tasks = [t for t in tasks if t['branch'] != task_branch]
-                self._save_tasks(tasks)
-                return True, f"Abandoned and deleted task '{task_name}'"
+            deleted, output = self.git.delete_branch(task_branch)
+
+        # 将任务状态更新为终止，已删除分支的任务直接移除，只写一次任务文件
+        with self._tasks_txn() as tasks:
+            if deleted:
+                tasks[:] = [t for t in tasks if t['branch'] != task_branch]
             else:
-                return False, f"Failed to delete branch: {output}"
+                self._mark_task(tasks, task_name, TaskStatus.ABORTED)
+
+        if deleted:
+            return True, f"Abandoned and deleted task '{task_name}'"
+        if delete_branch:
+            return False, f"Failed to delete branch: {output}"
         
         return True, f"Abandoned all changes in task '{task_name}' and switched to {base_branch}"
     
@@ -321,29 +419,39 @@ class TaskManager:
             return 0
         
         tasks = self._load_tasks()
-        current_time = datetime.now()
-        tasks_to_delete = []
-        current_branch = self.git.get_current_branch()
+        # The timestamp format sorts lexicographically, so compare strings directly
+        cutoff = (datetime.now() - timedelta(days=days)).strftime(TIME_FORMAT)
         
-        for task in tasks:
-            if task["branch"] == current_branch:
-                continue
-
-            last_activity = datetime.strptime(task["last_activity"], "%Y-%m-%d %H:%M:%S")
-            days_old = (current_time - last_activity).days
-            
-            if days_old >= days:
-                # 检查任务状态，只删除已合并的任务
-                if merged_only and task["status"] != TaskStatus.MERGED.value:
-                    continue
+        # 先按状态和时间过滤，没有候选任务时不做任何 Git 操作
+        merged = TaskStatus.MERGED
+        candidates = [
+            task for task in tasks
+            if task["last_activity"] <= cutoff
+            and (not merged_only or task["status"] == merged)
+        ]
+        if not candidates:
+            return 0
+        
+        current_branch = self.git.get_current_branch()
+        local_branches = self.git.list_local_branches()
+        candidates = [
+            task for task in candidates
+            if task["branch"] != current_branch and task["branch"] in local_branches
+        ]
 
-                if self.git.verify_branch_exists(task['branch']):
-                    success, _ = self.git.delete_branch(task["branch"])
-                    if success:
-                        tasks_to_delete.append(task)
+        tasks_to_delete = []
+        if candidates:
+            success, _ = self.git.delete_branches([task["branch"] for task in candidates])
+            if success:
+                tasks_to_delete = candidates
+            else:
+                # Some deletions may still have gone through; keep only the tasks whose branch is gone
+                remaining = self.git.list_local_branches()
+                tasks_to_delete = [task for task in candidates if task["branch"] not in remaining]
 
         if tasks_to_delete:
-            tasks = [task for task in tasks if task not in tasks_to_delete]
+            deleted_ids = {task["id"] for task in tasks_to_delete}
+            tasks = [task for task in tasks if task["id"] not in deleted_ids]
             self._save_tasks(tasks)
         
         return len(tasks_to_delete)
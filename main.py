@@ -1,24 +1,40 @@
 #!/usr/bin/env python3
 import os
 import sys
-from typing import Optional, List
+from typing import Optional, TYPE_CHECKING
 import click
 from colorama import init, Fore
-from datetime import datetime
+from functools import lru_cache
 
 init(autoreset=True)
 
-# Import operations modules
-try:
-    from codesnap.git import GitOps
-    from codesnap.task import TaskManager
-except ImportError:
-    # For development
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_TASK_TABLE_HEADER = ("ID | NAME | STATUS | CREATED | LAST ACTIVITY | COMMITS | DESCRIPTION\n"
+                      "---+------+--------+---------+--------------+---------+------------")
+_TASK_ROW_FORMAT = "{id} | {name} | {status} | {created} | {last_activity} | {commits} | {description}"
+
+if TYPE_CHECKING:
     from codesnap.git import GitOps
     from codesnap.task import TaskManager
 
 
+@lru_cache(maxsize=None)
+def _get_task_manager() -> "TaskManager":
+    # Import operations modules on first use, so --help and usage errors
+    # don't pay for loading GitPython and pydantic
+    try:
+        from codesnap.task import TaskManager
+    except ImportError:
+        # For development
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from codesnap.task import TaskManager
+    return TaskManager()
+
+
+def _get_git_ops() -> "GitOps":
+    # Share the task manager's GitOps so the repository is opened only once
+    return _get_task_manager().git
+
+
 # Main CLI group
 @click.group(help=f"{Fore.CYAN}CS - CodeSnap{Fore.RESET} - AI-powered code snapshot tool")
 def cli() -> None:
@@ -29,7 +45,7 @@ def cli() -> None:
 @cli.command(help="Initialize a new repository with CodeSnap")
 @click.option("--branch", default="master", help="Name of the main branch")
 def init(branch: str) -> None:
-    git_ops = GitOps()
+    git_ops = _get_git_ops()
     success = git_ops.initialize_repository(branch)
     if success:
         click.echo(f"[{Fore.GREEN}SUCCESS{Fore.RESET}] Created Git repository with {branch} branch")
@@ -44,7 +60,7 @@ def init(branch: str) -> None:
 @click.option("--force", is_flag=True, help="Create task branch with current changes")
 @click.option("--branch", help="Base branch (defaults to current branch)")
 def start(task_name: str, description: str, force: bool, branch: Optional[str]) -> None:
-    task_manager = TaskManager()
+    task_manager = _get_task_manager()
     success, message = task_manager.create_task(task_name, description, force, branch)
     if success:
         click.echo(f"[{Fore.GREEN}SUCCESS{Fore.RESET}] {message}")
@@ -56,7 +72,7 @@ def start(task_name: str, description: str, force: bool, branch: Optional[str])
 @cli.command(help="Commit changes to the current task branch")
 @click.argument("message")
 def commit(message: str) -> None:
-    git_ops = GitOps()
+    git_ops = _get_git_ops()
     success, result = git_ops.commit_changes(message)
     if success:
         click.echo(result)
@@ -67,7 +83,7 @@ def commit(message: str) -> None:
 # Apply changes to main branch
 @cli.command(help="Apply all changes to the main branch without committing")
 def apply() -> None:
-    task_manager = TaskManager()
+    task_manager = _get_task_manager()
     success, message = task_manager.apply_changes()
     if success:
         click.echo(f"[{Fore.GREEN}INFO{Fore.RESET}] {message}")
@@ -81,7 +97,7 @@ def apply() -> None:
 @click.option("--message", "-m", help="Commit message")
 @click.option("--squash", is_flag=True, help="Squash all commits into one")
 def merge(commit: bool, message: Optional[str], squash: bool) -> None:
-    task_manager = TaskManager()
+    task_manager = _get_task_manager()
     success, result = task_manager.merge_changes(commit, message, squash)
     if success:
         click.echo(f"[{Fore.GREEN}SUCCESS{Fore.RESET}] {result}")
@@ -92,7 +108,7 @@ def merge(commit: bool, message: Optional[str], squash: bool) -> None:
 # Abort current task
 @cli.command(help="Abandon all changes in the current task")
 def abort() -> None:
-    task_manager = TaskManager()
+    task_manager = _get_task_manager()
     success, message = task_manager.abort_task()
     if success:
         click.echo(f"[{Fore.GREEN}INFO{Fore.RESET}] {message}")
@@ -103,39 +119,33 @@ def abort() -> None:
 # List all tasks
 @cli.command(help="List all task branches")
 def list() -> None:
-    task_manager = TaskManager()
+    task_manager = _get_task_manager()
     tasks = task_manager.list_tasks()
 
     if not tasks:
         click.echo("No tasks found.")
         return
 
-    # Print table header
-    click.echo("ID | NAME | STATUS | CREATED | LAST ACTIVITY | COMMITS | DESCRIPTION")
-    click.echo("---+------+--------+---------+--------------+---------+------------")
-
-    # Print tasks
-    for task in tasks:
-        click.echo(
-            f"{task['id']} | {task['name']} | {task['status']} | {task['created']} | {task['last_activity']} | {task['commits']} | {task['description']}")
+    # Print table header and tasks in a single write
+    body = "\n".join(_TASK_ROW_FORMAT.format_map(task) for task in tasks)
+    click.echo(_TASK_TABLE_HEADER + "\n" + body)
 
 
 # View task log
 @cli.command(help="View commits in the current task")
 @click.option("--graph", is_flag=True, help="Show commit graph")
 def log(graph: bool) -> None:
-    git_ops = GitOps()
-    commits = git_ops.get_task_log(graph)
-    for commit in commits:
+    git_ops = _get_git_ops()
+    for commit in git_ops.iter_task_log(graph):
         click.echo(commit)
 
 
 # View diff between task and main branch
 @cli.command(help="Show differences between task branch and main branch")
 def diff() -> None:
-    git_ops = GitOps()
-    differences = git_ops.get_diff()
-    click.echo(differences)
+    git_ops = _get_git_ops()
+    for line in git_ops.iter_diff():
+        click.echo(line, nl=False)
 
 
 # Prune old task branches
@@ -143,7 +153,7 @@ def diff() -> None:
 @click.option("--days", type=int, default=30, help="Delete branches older than this many days")
 @click.option("--merged", is_flag=True, help="Only delete merged branches")
 def prune(days: int, merged: bool) -> None:
-    task_manager = TaskManager()
+    task_manager = _get_task_manager()
     count = task_manager.prune_tasks(days, merged)
     if count > 0:
         click.echo(f"[{Fore.GREEN}SUCCESS{Fore.RESET}] Cleaned up {count} task branch(es) older than {days} days")
@@ -1,18 +1,87 @@
+import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 from mcp.server.fastmcp import FastMCP
-from mcp.server.stdio import stdio_server
 
+from codesnap.models import TaskStatus
 from codesnap.store import store
 
+logger = logging.getLogger(__name__)
+
 mcp = FastMCP("mcp-codesnap")
 
+# Result tags prefixed to tool responses
+_OK = "[SUCCESS]"
+_ERR = "[ERROR]"
+_INFO = "[INFO]"
+
+
+def _result(success: bool, message: str) -> str:
+    return f"{_OK if success else _ERR} {message}"
+
+
+# Formatted task table, reused until the task files change or a mutating tool runs
+_list_cache: Dict[str, Any] = {"key": None, "val": None}
+
+
+class _RepoLock:
+    """Reader/writer lock around the repository for tools whose git calls run in threads.
+    
+    Read-only tools may run together; a tool that changes the repository waits for
+    them to finish and runs alone. Waiting writers block new readers so they are
+    not starved.
+    """
+
+    def __init__(self) -> None:
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writing and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        async with self._cond:
+            self._waiting_writers += 1
+            try:
+                await self._cond.wait_for(lambda: not self._writing and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+_repo_lock = _RepoLock()
+
+
+def _invalidate_task_list() -> None:
+    _list_cache["key"] = None
+    _list_cache["val"] = None
+
 
 @mcp.tool()
-def task_list() -> str:
+async def task_list() -> str:
     """Lists all tasks in the repository.
     
     Returns a formatted table of tasks with their ID, name, status, creation date,
@@ -21,44 +90,59 @@ def task_list() -> str:
     Returns:
         str: Formatted list of tasks or a message if no tasks are found.
     """
-    tasks = store.task_manager.list_tasks()
-    if not tasks:
-        return "No tasks found."
+    async with _repo_lock.read():
+        task_manager = store.task_manager
+        key = (task_manager, task_manager.config.tasks_version())
+        if _list_cache["key"] == key:
+            return _list_cache["val"]
 
-    headers = ["ID", "NAME", "STATUS", "CREATED", "LAST ACTIVITY", "COMMITS", "DESCRIPTION"]
+        result = await asyncio.to_thread(lambda: _format_task_list(task_manager.list_tasks()))
+        _list_cache["key"] = key
+        _list_cache["val"] = result
+        return result
 
-    widths = [len(header) for header in headers]
 
-    for task in tasks:
-        widths[0] = max(widths[0], len(str(task['id'])))
-        widths[1] = max(widths[1], len(str(task['name'])))
-        widths[2] = max(widths[2], len(str(task['status'])))
-        widths[3] = max(widths[3], len(task['created']))
-        widths[4] = max(widths[4], len(task['last_activity']))
-        widths[5] = max(widths[5], len(str(task['commits'])))
-        widths[6] = max(widths[6], len(str(task['description'])))
+# Status cells repeat a handful of values, so render each one once
+_STATUS_TEXT = {status: str(status) for status in TaskStatus}
 
-    format_str = "  ".join([f"{{:{w}}}" for w in widths])
+# ID and COMMITS are numbers and stay right-aligned in data rows
+_ROW_JUSTIFY = (str.rjust, str.ljust, str.ljust, str.ljust, str.ljust, str.rjust, str.ljust)
 
-    formated_lines = [format_str.format(*headers)]
 
-    for task in tasks:
-        formated_lines.append(format_str.format(
-            task['id'],
+def _format_task_list(tasks: List[Dict[str, Any]]) -> str:
+    """Formats tasks as an aligned table, one row per task."""
+    if not tasks:
+        return "No tasks found."
+
+    headers = ["ID", "NAME", "STATUS", "CREATED", "LAST ACTIVITY", "COMMITS", "DESCRIPTION"]
+
+    # Stringify the cells once, then size each column in a single pass
+    rows = [
+        (
+            str(task['id']),
             task['name'],
-            task['status'],
+            _STATUS_TEXT[task['status']],
             task['created'],
             task['last_activity'],
-            task['commits'],
+            str(task['commits']),
             task['description']
-        ))
+        )
+        for task in tasks
+    ]
+    widths = [max(map(len, column)) for column in zip(headers, *rows)]
+
+    formated_lines = ["  ".join([header.ljust(w) for header, w in zip(headers, widths)])]
+    formated_lines.extend(
+        "  ".join([justify(cell, w) for justify, cell, w in zip(_ROW_JUSTIFY, row, widths)])
+        for row in rows
+    )
 
     return "\n".join(formated_lines)
 
 
 @mcp.tool()
-def task_create(task_name: str, description: str = "", force: bool = False,
-             base_branch: Optional[str] = None) -> str:
+async def task_create(task_name: str, description: str = "", force: bool = False,
+                   base_branch: str = "") -> str:
     """Creates a new task branch and switches to it.
     
     Creates a new branch with the task prefix and registers it in the task management system.
@@ -73,18 +157,57 @@ def task_create(task_name: str, description: str = "", force: bool = False,
     Returns:
         str: Success or error message with details about the operation
     """
-    success, message = store.task_manager.create_task(
-        task_name,
-        description,
-        force,
-        base_branch
-    )
-    status = "SUCCESS" if success else "ERROR"
-    return f"[{status}] {message}"
+    async with _repo_lock.write():
+        _invalidate_task_list()
+        success, message = await asyncio.to_thread(
+            store.task_manager.create_task,
+            task_name,
+            description,
+            force,
+            base_branch
+        )
+    return _result(success, message)
+
+
+@mcp.tool()
+async def task_create_many(tasks: List[Dict[str, str]], base_branch: str = "") -> str:
+    """Creates several task branches at once without switching branches.
+    
+    Registers every task in the task management system and creates all of the
+    task branches from the same base branch in a single git call. The current
+    branch is left checked out.
+    
+    Args:
+        tasks: Tasks to create, each with a "name" and an optional "description"
+        base_branch: Base branch to branch from (defaults to current branch)
+    
+    Returns:
+        str: Success message with a table of the created tasks, or error message
+    """
+    for index, task in enumerate(tasks, 1):
+        if not isinstance(task.get("name"), str) or not task["name"]:
+            return _result(False, f"Task #{index} is missing a name")
+
+    specs = [(task["name"], task.get("description", "")) for task in tasks]
+    async with _repo_lock.write():
+        _invalidate_task_list()
+        success, message = await asyncio.to_thread(_create_tasks, specs, base_branch)
+    return _result(success, message)
+
+
+def _create_tasks(specs: List[Tuple[str, str]], base_branch: str) -> Tuple[bool, str]:
+    """Creates the tasks and lists them in the same table format as task_list."""
+    task_manager = store.task_manager
+    success, message = task_manager.create_tasks(specs, base_branch)
+    if success:
+        # create_tasks appends the new tasks to the end of the task list
+        created = task_manager.list_tasks()[-len(specs):]
+        message = f"{message}\n{_format_task_list(created)}"
+    return success, message
 
 
 @mcp.tool()
-def task_merge(commit: bool = False, message: Optional[str] = None, squash: bool = False) -> str:
+async def task_merge(commit: bool = False, message: str = "", squash: bool = False) -> str:
     """Merges task changes to the main branch.
     
     Integrates changes from the current task branch into its base branch.
@@ -99,17 +222,19 @@ def task_merge(commit: bool = False, message: Optional[str] = None, squash: bool
     Returns:
         str: Success or error message with details about the operation
     """
-    success, message = store.task_manager.merge_changes(
-        commit,
-        message,
-        squash
-    )
-    status = "SUCCESS" if success else "ERROR"
-    return f"[{status}] {message}"
+    async with _repo_lock.write():
+        _invalidate_task_list()
+        success, message = await asyncio.to_thread(
+            store.task_manager.merge_changes,
+            commit,
+            message,
+            squash
+        )
+    return _result(success, message)
 
 
 @mcp.tool()
-def task_abort(delete_branch: bool = False) -> str:
+async def task_abort(delete_branch: bool = False) -> str:
     """Abandons all changes and returns to base branch.
     
     Resets all changes in the current task branch, switches back to the base branch,
@@ -122,13 +247,14 @@ def task_abort(delete_branch: bool = False) -> str:
     Returns:
         str: Success or error message with details about the operation
     """
-    success, message = store.task_manager.abort_task(delete_branch)
-    status = "SUCCESS" if success else "ERROR"
-    return f"[{status}] {message}"
+    async with _repo_lock.write():
+        _invalidate_task_list()
+        success, message = await asyncio.to_thread(store.task_manager.abort_task, delete_branch)
+    return _result(success, message)
 
 
 @mcp.tool()
-def task_prune(days: int = 30, merged_only: bool = False) -> str:
+async def task_prune(days: int = 30, merged_only: bool = False) -> str:
     """Cleans up old task branches based on inactivity period.
     
     Removes task branches that have been inactive for the specified number of days.
@@ -143,15 +269,44 @@ def task_prune(days: int = 30, merged_only: bool = False) -> str:
     Returns:
         str: Success or info message with number of branches deleted
     """
-    count = store.task_manager.prune_tasks(days, merged_only)
+    async with _repo_lock.write():
+        _invalidate_task_list()
+        count = await asyncio.to_thread(store.task_manager.prune_tasks, days, merged_only)
     if count > 0:
-        return f"[SUCCESS] Cleaned up {count} task branch(es) older than {days} days"
+        return f"{_OK} Cleaned up {count} task branch(es) older than {days} days"
     else:
-        return f"[INFO] No branches were deleted"
+        return f"{_INFO} No branches were deleted"
+
+
+# Commits shown by task_log by default and by task_overview
+_LOG_LIMIT = 500
+
+# Characters git draws before the abbreviated hash in `log --graph --oneline`
+_GRAPH_CHARS = "|/\\_-.* "
+
+
+def _format_log(log_entries: List[str], show_graph: bool, max_count: int) -> str:
+    """Formats log lines fetched with one commit beyond max_count, noting when the log was cut off."""
+    cut = None
+    if max_count > 0:
+        commits = 0
+        for index, line in enumerate(log_entries):
+            # Graph connector lines (|, /, \) do not start a commit
+            if not show_graph or "*" in line[:len(line) - len(line.lstrip(_GRAPH_CHARS))]:
+                commits += 1
+                if commits > max_count:
+                    cut = index
+                    break
+
+    result = "Commit Log:\n" + "\n".join(log_entries[:cut])
+    if cut is not None:
+        result += f"\n(showing first {max_count} commits; pass max_count=0 for all)"
+    return result
 
 
 @mcp.tool()
-def task_log(show_graph: bool = False) -> str:
+async def task_log(show_graph: bool = False, max_count: int = _LOG_LIMIT,
+                   first_parent: bool = False) -> str:
     """Shows the commit log of the task branch relative to the main branch.
     
     Displays the commit history that is unique to the current task branch.
@@ -160,25 +315,41 @@ def task_log(show_graph: bool = False) -> str:
     Args:
         show_graph: Whether to display a graphical representation of the commit
                     history (defaults to False)
+        max_count: Maximum number of commits to show, 0 for all (defaults to 500)
+        first_parent: Whether to only follow the first parent of merge commits
+                      (defaults to False)
     
     Returns:
         str: Formatted commit log or error message
     """
-    log_entries = store.git_ops.get_task_log(show_graph)
-    return "Commit Log:\n" + "\n".join(log_entries)
+    # Ask for one extra commit to tell whether the log was cut off
+    limit = max_count + 1 if max_count > 0 else max_count
+    async with _repo_lock.read():
+        log_entries = await asyncio.to_thread(store.git_ops.get_task_log, show_graph, limit, first_parent)
+    return _format_log(log_entries, show_graph, max_count)
 
 
 @mcp.tool()
-def task_status() -> str:
+async def task_status(quick: bool = False) -> str:
     """Shows working tree status of the repository.
     
     Reports the state of the working directory and staging area,
     showing which files have been modified, staged, or are untracked.
     
+    Args:
+        quick: Whether to only report if tracked files are clean or dirty, without
+               listing the changed files or looking for untracked ones
+               (defaults to False)
+    
     Returns:
         str: Current status of the working directory or a message if no changes
     """
-    status = store.git_ops.get_changes()
+    async with _repo_lock.read():
+        if quick:
+            dirty = await asyncio.to_thread(store.git_ops.is_dirty)
+            return "Working directory dirty." if dirty else "Working directory clean."
+
+        status = await asyncio.to_thread(store.git_ops.get_changes)
     if status:
         return f"Working directory status:\n{status}"
     else:
@@ -186,21 +357,60 @@ def task_status() -> str:
 
 
 @mcp.tool()
-def task_diff() -> str:
+async def task_diff(name_only: bool = False) -> str:
     """Shows changes between task and main branch.
     
     Displays the differences between the current task branch and its base branch,
     showing file modifications, additions, and deletions.
     
+    Args:
+        name_only: Whether to only list changed files with their status letter
+                   instead of the full patch (defaults to False)
+    
     Returns:
         str: Diff output or error message
     """
-    diff = store.git_ops.get_diff()
+    async with _repo_lock.read():
+        diff = await asyncio.to_thread(store.git_ops.get_diff, name_only)
     return f"Diff with main branch:\n{diff}"
 
 
 @mcp.tool()
-def task_commit(message: str) -> str:
+async def task_overview(show_graph: bool = False) -> str:
+    """Shows status, commit log and diff of the current task in one call.
+    
+    Runs the independent git queries behind task_status, task_log and task_diff
+    concurrently, so the combined call costs about as much as the slowest one.
+    The commit log is capped at task_log's default of 500 commits.
+    
+    Args:
+        show_graph: Whether to display a graphical representation of the commit
+                    history (defaults to False)
+    
+    Returns:
+        str: Working directory status, commit log and diff with the main branch
+    """
+    git_ops = store.git_ops
+    async with _repo_lock.read():
+        # 先解析主分支，避免并发线程重复探测
+        git_ops.get_main_branch()
+
+        status, log_entries, diff = await asyncio.gather(
+            asyncio.to_thread(git_ops.get_changes),
+            asyncio.to_thread(git_ops.get_task_log, show_graph, _LOG_LIMIT + 1),
+            asyncio.to_thread(git_ops.get_diff),
+        )
+
+    status_text = f"Working directory status:\n{status}" if status else "Working directory clean."
+    return "\n\n".join([
+        status_text,
+        _format_log(log_entries, show_graph, _LOG_LIMIT),
+        f"Diff with main branch:\n{diff}",
+    ])
+
+
+@mcp.tool()
+async def task_commit(message: str) -> str:
     """Commits changes to current task branch.
     
     Records all current changes in the task branch with the specified commit message.
@@ -212,13 +422,14 @@ def task_commit(message: str) -> str:
     Returns:
         str: Success or error message with commit details
     """
-    success, result_message = store.git_ops.commit_changes(message)
-    status = "SUCCESS" if success else "ERROR"
-    return f"[{status}] {result_message}"
+    async with _repo_lock.write():
+        _invalidate_task_list()
+        success, result_message = await asyncio.to_thread(store.git_ops.commit_changes, message)
+    return _result(success, result_message)
 
 
 @mcp.tool()
-def git_init(branch_name: str = "master") -> str:
+async def git_init(branch_name: str = "master") -> str:
     """Initializes a new Git repository in the current directory.
     
     Creates a new Git repository with an initial commit and the specified
@@ -230,24 +441,23 @@ def git_init(branch_name: str = "master") -> str:
     Returns:
         str: Success or error message about the repository initialization
     """
-    success = store.git_ops.initialize_repository(branch_name)
+    async with _repo_lock.write():
+        _invalidate_task_list()
+        success = await asyncio.to_thread(store.git_ops.initialize_repository, branch_name)
     if success:
-        return f"[SUCCESS] Created Git repository with {branch_name} branch"
+        return f"{_OK} Created Git repository with {branch_name} branch"
     else:
-        return "[ERROR] Failed to initialize repository"
+        return f"{_ERR} Failed to initialize repository"
 
 
 def setup_manager(repository: Path | None = None) -> None:
-    import sys
-
     if repository is None:
         repository = Path(os.getcwd())
 
     try:
         store.setup_manager(str(repository))
-    except Exception as e:
-        sys.stderr.write(f"Error initializing services: {str(e)}")
-        return
+    except Exception:
+        logger.exception("Error initializing services")
 
 
 async def serve(repository: Path | None = None) -> None:
@@ -255,8 +465,6 @@ async def serve(repository: Path | None = None) -> None:
     await mcp.run_stdio_async()
 
 if __name__ == "__main__":
-    import asyncio
-
     logging.basicConfig(level=logging.INFO)
 
     asyncio.run(serve(None))